@@ -1,59 +1,331 @@
-"""AES-256-GCM 加/解密模块，兼容 gui.py
+"""AES-256-GCM / ChaCha20-Poly1305 加/解密模块，兼容 gui.py
+
+默认使用 AES-256-GCM；在没有 AES 硬件加速的 CPU 上自动改用 ChaCha20-Poly1305。
+token 以 4 字节魔数开头，随后 1 字节版本/算法标记与 1 字节 KDF 参数（log2(迭代次数) 与
+salt 长度），decrypt 据此选择算法与迭代次数；也兼容无头部的旧 token（固定 200_000 次迭代）。
 
 接口：
-    encrypt(password: str, plaintext: str) -> str
+    encrypt(password: str, plaintext: str, log2_iterations: int | None = None) -> str
     decrypt(password: str, token: str) -> str
+    encrypt_file(password: str, in_path: str, out_path: str, progress=None,
+                 log2_iterations: int | None = None) -> None
+    decrypt_file(password: str, in_path: str, out_path: str, progress=None) -> None
+    is_encrypted_file(path: str) -> bool
+    clear_key_cache() -> None
     命令行：encrypt/decrypt/demo
 """
-import base64
+from __future__ import annotations
+
+import binascii
+import ctypes
+import ctypes.util
+import functools
+import hashlib
 import os
 import sys
 import argparse
 try:
-    from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-    from cryptography.hazmat.primitives import hashes
-    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
 except Exception as e:
     raise ImportError("缺少依赖：请先 pip install cryptography") from e
 
-def _derive_key(password: str, salt: bytes, iterations: int = 200_000) -> bytes:
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=iterations,
-    )
-    return kdf.derive(password.encode("utf-8"))
-
-def encrypt(password: str, plaintext: str) -> str:
-    if not isinstance(plaintext, str):
-        raise TypeError("plaintext 必须是 str 类型")
-    salt = os.urandom(16)
-    key = _derive_key(password, salt)
-    aesgcm = AESGCM(key)
-    nonce = os.urandom(12)
-    ciphertext = aesgcm.encrypt(nonce, plaintext.encode("utf-8"), None)
-    token = salt + nonce + ciphertext
-    return base64.b64encode(token).decode("utf-8")
+def _load_fastpbkdf2():
+    """若系统中存在 libfastpbkdf2，则返回其 fastpbkdf2_hmac_sha256 函数，否则返回 None。"""
+    try:
+        libname = ctypes.util.find_library("fastpbkdf2")
+        if libname is None:
+            return None
+        fn = ctypes.CDLL(libname).fastpbkdf2_hmac_sha256
+        fn.restype = None
+        fn.argtypes = [
+            ctypes.c_char_p, ctypes.c_size_t,
+            ctypes.c_char_p, ctypes.c_size_t,
+            ctypes.c_uint32,
+            ctypes.c_char_p, ctypes.c_size_t,
+        ]
+        # 能力检查：结果必须与标准库一致才启用
+        out = ctypes.create_string_buffer(32)
+        fn(b"password", 8, b"salt", 4, 2, out, 32)
+        if out.raw != hashlib.pbkdf2_hmac("sha256", b"password", b"salt", 2, 32):
+            return None
+        return fn
+    except Exception:
+        return None
+
+_fastpbkdf2_hmac_sha256 = _load_fastpbkdf2()
+
+@functools.lru_cache(maxsize=32)
+def _derive_key_cached(password_bytes: bytes, salt: bytes, iterations: int, length: int) -> bytes:
+    if _fastpbkdf2_hmac_sha256 is not None:
+        # fastpbkdf2 预计算 HMAC 内/外层哈希中间状态，每轮只做两次压缩
+        out = ctypes.create_string_buffer(length)
+        _fastpbkdf2_hmac_sha256(password_bytes, len(password_bytes), salt, len(salt),
+                                iterations, out, length)
+        return out.raw
+    # hashlib.pbkdf2_hmac 直接进入 OpenSSL 的 C 循环，省去 Python 层封装开销；
+    # length > 32 时各块也在同一次 C 调用内完成（期间释放 GIL）
+    return hashlib.pbkdf2_hmac("sha256", password_bytes, salt, iterations, length)
+
+def _derive_key(password: str, salt: bytes, iterations: int = 200_000, length: int = 32) -> bytes:
+    # 以 (password, salt, iterations, length) 为键缓存，重复解密同一 token 时跳过 PBKDF2
+    if length <= 0:
+        raise ValueError("length 必须为正整数")
+    return _derive_key_cached(password.encode("utf-8"), bytes(salt), iterations, length)
+
+def clear_key_cache() -> None:
+    """清空已派生密钥的缓存（用于主动从内存中清除密钥）。"""
+    _derive_key_cached.cache_clear()
+    _aead_for.cache_clear()
+
+_SALT_LEN = 16
+_NONCE_LEN = 12
+_TAG_LEN = 16
+# 无标记旧 token 的最短长度（salt + nonce + tag），也是所有 token 的下限
+_MIN_TOKEN_LEN = _SALT_LEN + _NONCE_LEN + _TAG_LEN
+
+# token 头：魔数 + 版本/算法字节 + KDF 参数字节
+# 版本/算法字节高 4 位为格式版本，低 4 位为 AEAD 算法
+# （两种算法均为 32 字节密钥、12 字节 nonce、16 字节 tag）
+_ALG_AESGCM = 0x01
+_ALG_CHACHA20 = 0x02
+_AEAD_CLASSES = {
+    _ALG_AESGCM: AESGCM,
+    _ALG_CHACHA20: ChaCha20Poly1305,
+}
+# 版本 1：魔数 + 标记 + KDF 参数字节 + salt + nonce + ciphertext
+#         KDF 参数字节低 5 位为 log2(迭代次数)，高 3 位为 salt 长度 / 8
+# 无头部的旧 token 以随机 salt 开头，魔数让两者几乎不可能混淆（误判概率 2**-32）；
+# 头部一旦解析成功便按版本 1 处理，失败时不再以旧格式重试
+_MAGIC = b"\x89GGT"
+_VERSION_KDF_BYTE = 0x1
+_HEADER_LEN = len(_MAGIC) + 2
+_LEGACY_ITERATIONS = 200_000
+
+# encrypt 默认迭代次数为 2**17（低于旧格式的 200_000）；
+# 已知输入为高熵随机串时可通过 log2_iterations 进一步调低
+DEFAULT_LOG2_ITERATIONS = 17
+# encrypt 不会产生更高的迭代次数，decrypt 也拒绝更高的值，
+# 被篡改的 token 因而无法触发比正常解密更长的密钥派生
+_MAX_LOG2_ITERATIONS = DEFAULT_LOG2_ITERATIONS
+
+# 文件流式加/解密的分块大小
+_FILE_CHUNK_SIZE = 1 << 20
+
+def _cpu_has_aes_accel(cpuinfo_path: str = "/proc/cpuinfo") -> bool:
+    """根据 /proc/cpuinfo 判断 CPU 是否支持 AES + 无进位乘法（AES-NI/PCLMULQDQ 或 ARMv8 AES/PMULL）。
+
+    无法判断时（非 Linux 等）视为支持，保持 AES-GCM。
+    """
+    try:
+        with open(cpuinfo_path, "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key.strip() in ("flags", "Features"):
+                    flags = set(value.split())
+                    return "aes" in flags and ("pclmulqdq" in flags or "pmull" in flags)
+    except OSError:
+        pass
+    return True
+
+def _choose_default_alg() -> int:
+    if _cpu_has_aes_accel():
+        return _ALG_AESGCM
+    try:
+        # 部分 OpenSSL/LibreSSL 构建不支持 ChaCha20-Poly1305
+        ChaCha20Poly1305(b"\x00" * 32)
+    except Exception:
+        return _ALG_AESGCM
+    return _ALG_CHACHA20
+
+_DEFAULT_ALG = _choose_default_alg()
+
+# 按 (算法, 密钥) 在模块级共享 AEAD 对象：cryptography 在对象内部持有已完成
+# 密钥扩展的 OpenSSL EVP 上下文，复用即可省去每次调用的上下文分配与密钥扩展。
+# AESGCM/ChaCha20Poly1305 的 encrypt/decrypt 可重入，多个线程共用同一对象是安全的
+@functools.lru_cache(maxsize=16)
+def _aead_for(alg: int, key: bytes):
+    return _AEAD_CLASSES[alg](key)
+
+def _check_log2_iterations(log2_iterations: int | None) -> int:
+    if log2_iterations is None:
+        return DEFAULT_LOG2_ITERATIONS
+    if not 0 <= log2_iterations <= _MAX_LOG2_ITERATIONS:
+        raise ValueError(f"log2_iterations 必须在 0 到 {_MAX_LOG2_ITERATIONS} 之间")
+    return log2_iterations
+
+def _make_header(alg: int, log2_iterations: int) -> bytes:
+    """生成版本 1 的 token 头（魔数 + 版本/算法 + KDF 参数）。"""
+    return _MAGIC + bytes(((_VERSION_KDF_BYTE << 4) | alg, ((_SALT_LEN // 8) << 5) | log2_iterations))
+
+def encrypt(password: str, plaintext: str, log2_iterations: int | None = None) -> str:
+    assert isinstance(plaintext, str), "plaintext 必须是 str 类型"
+    log2_iterations = _check_log2_iterations(log2_iterations)
+    salt = os.urandom(_SALT_LEN)
+    key = _derive_key(password, salt, 1 << log2_iterations)
+    aead = _aead_for(_DEFAULT_ALG, key)
+    nonce = os.urandom(_NONCE_LEN)
+    data = plaintext.encode("utf-8")
+    # 预分配 头部 + salt + nonce + ciphertext 的完整缓冲区，避免拼接产生的中间拷贝
+    salt_start = _HEADER_LEN
+    nonce_start = salt_start + _SALT_LEN
+    header_len = nonce_start + _NONCE_LEN
+    buf = bytearray(header_len + len(data) + _TAG_LEN)
+    buf[:salt_start] = _make_header(_DEFAULT_ALG, log2_iterations)
+    buf[salt_start:nonce_start] = salt
+    buf[nonce_start:header_len] = nonce
+    # 旧版 cryptography 没有 encrypt_into，此时退回到 encrypt + 单次拷贝
+    if hasattr(aead, "encrypt_into"):
+        aead.encrypt_into(nonce, data, None, memoryview(buf)[header_len:])
+    else:
+        buf[header_len:] = aead.encrypt(nonce, data, None)
+    return binascii.b2a_base64(buf, newline=False).decode("ascii")
+
+def _parse_header(data: bytes):
+    """解析 token 头，返回 (算法, 迭代次数, salt 长度, 头长度)；无法识别时返回 None。"""
+    if len(data) < _HEADER_LEN or data[:len(_MAGIC)] != _MAGIC:
+        return None
+    tag, kdf = data[len(_MAGIC)], data[len(_MAGIC) + 1]
+    version, alg = tag >> 4, tag & 0x0F
+    if version != _VERSION_KDF_BYTE or alg not in _AEAD_CLASSES:
+        return None
+    log2_iterations, salt_len = kdf & 0x1F, (kdf >> 5) * 8
+    if salt_len == 0 or log2_iterations > _MAX_LOG2_ITERATIONS:
+        return None
+    return alg, 1 << log2_iterations, salt_len, _HEADER_LEN
+
+def _open(alg: int, password: str, body: memoryview, iterations: int, salt_len: int) -> bytes:
+    """解析 salt + nonce + ciphertext 并解密，失败时抛出 cryptography 的异常。
+
+    body 为 memoryview：salt/nonce 很短，复制为 bytes；ciphertext 保持零拷贝切片。
+    """
+    salt = bytes(body[:salt_len])
+    nonce = bytes(body[salt_len:salt_len + _NONCE_LEN])
+    ciphertext = body[salt_len + _NONCE_LEN:]
+    key = _derive_key(password, salt, iterations)
+    return _aead_for(alg, key).decrypt(nonce, ciphertext, None)
 
 def decrypt(password: str, token: str) -> str:
     try:
-        data = base64.b64decode(token)
-    except Exception as exc:
+        data = binascii.a2b_base64(token)
+    except ValueError as exc:  # binascii.Error 及非 ASCII 字符串
         raise ValueError("token 不是有效的 base64 数据") from exc
-    if len(data) < 16 + 12 + 16:
+    if len(data) < _MIN_TOKEN_LEN:
         raise ValueError("token 数据太短，无法解析")
-    salt = data[:16]
-    nonce = data[16:28]
-    ciphertext = data[28:]
-    key = _derive_key(password, salt)
-    aesgcm = AESGCM(key)
+    header = _parse_header(data)
+    view = memoryview(data)
     try:
-        plaintext_bytes = aesgcm.decrypt(nonce, ciphertext, None)
+        if header is not None and len(data) >= header[3] + header[2] + _NONCE_LEN + _TAG_LEN:
+            alg, iterations, salt_len, header_len = header
+            plaintext_bytes = _open(alg, password, view[header_len:], iterations, salt_len)
+        else:
+            plaintext_bytes = _open(_ALG_AESGCM, password, view, _LEGACY_ITERATIONS, _SALT_LEN)
     except Exception as exc:
         raise ValueError("解密失败（密码错误或数据被篡改）") from exc
     return plaintext_bytes.decode("utf-8")
 
+def encrypt_file(password: str, in_path: str, out_path: str, progress=None,
+                 log2_iterations: int | None = None) -> None:
+    """以恒定内存流式加密文件，适合无法整体读入内存的大文件。
+
+    输出为版本 1 token 的原始二进制（不做 base64）：头 + salt + nonce + ciphertext + tag，
+    算法固定为 AES-256-GCM（ChaCha20Poly1305 不支持流式接口）。
+    progress 若提供，会以 progress(已处理字节数, 总字节数) 的形式被调用。
+    """
+    log2_iterations = _check_log2_iterations(log2_iterations)
+    salt = os.urandom(_SALT_LEN)
+    nonce = os.urandom(_NONCE_LEN)
+    key = _derive_key(password, salt, 1 << log2_iterations)
+    encryptor = Cipher(algorithms.AES(key), modes.GCM(nonce)).encryptor()
+    total = os.path.getsize(in_path)
+    done = 0
+    chunk = bytearray(_FILE_CHUNK_SIZE)
+    out_buf = bytearray(_FILE_CHUNK_SIZE + 15)  # update_into 要求多留 block_size - 1 字节
+    chunk_view, out_view = memoryview(chunk), memoryview(out_buf)
+    tmp_path = out_path + ".part"
+    try:
+        with open(in_path, "rb") as fin, open(tmp_path, "wb") as fout:
+            fout.write(_make_header(_ALG_AESGCM, log2_iterations))
+            fout.write(salt)
+            fout.write(nonce)
+            while True:
+                n = fin.readinto(chunk)
+                if not n:
+                    break
+                fout.write(out_view[:encryptor.update_into(chunk_view[:n], out_buf)])
+                done += n
+                if progress is not None:
+                    progress(done, total)
+            fout.write(encryptor.finalize())
+            fout.write(encryptor.tag)
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
+
+def decrypt_file(password: str, in_path: str, out_path: str, progress=None) -> None:
+    """流式解密 encrypt_file 生成的文件。
+
+    解密结果先写入临时文件，认证通过后才替换到 out_path；失败时抛出 ValueError。
+    """
+    total = os.path.getsize(in_path)
+    tmp_path = out_path + ".part"
+    try:
+        with open(in_path, "rb") as fin:
+            header = _parse_header(fin.read(_HEADER_LEN))
+            if header is None or header[0] != _ALG_AESGCM:
+                raise ValueError("不是有效的加密文件")
+            _, iterations, salt_len, header_len = header
+            salt = fin.read(salt_len)
+            nonce = fin.read(_NONCE_LEN)
+            body_start = header_len + salt_len + _NONCE_LEN
+            remaining = body_len = total - body_start - _TAG_LEN
+            if remaining < 0:
+                raise ValueError("文件数据太短，无法解析")
+            fin.seek(total - _TAG_LEN)
+            tag = fin.read(_TAG_LEN)
+            fin.seek(body_start)
+            key = _derive_key(password, salt, iterations)
+            decryptor = Cipher(algorithms.AES(key), modes.GCM(nonce, tag)).decryptor()
+            chunk = bytearray(_FILE_CHUNK_SIZE)
+            out_buf = bytearray(_FILE_CHUNK_SIZE + 15)
+            chunk_view, out_view = memoryview(chunk), memoryview(out_buf)
+            done = 0
+            with open(tmp_path, "wb") as fout:
+                while remaining:
+                    n = fin.readinto(chunk_view[:min(remaining, _FILE_CHUNK_SIZE)])
+                    if not n:
+                        raise ValueError("文件被截断")
+                    fout.write(out_view[:decryptor.update_into(chunk_view[:n], out_buf)])
+                    remaining -= n
+                    done += n
+                    if progress is not None:
+                        progress(done, body_len)
+                try:
+                    fout.write(decryptor.finalize())
+                except InvalidTag as exc:
+                    raise ValueError("解密失败（密码错误或数据被篡改）") from exc
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
+
+def is_encrypted_file(path: str) -> bool:
+    """判断文件是否为 encrypt_file 生成的原始二进制（以魔数与合法头部开头）。
+
+    保存到文件的 base64 token 是文本，不会以魔数开头，返回 False。
+    """
+    with open(path, "rb") as f:
+        header = _parse_header(f.read(_HEADER_LEN))
+    return header is not None and header[0] == _ALG_AESGCM
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
 def _demo():
     samples = [
         "Hello, world!",
@@ -81,12 +353,15 @@ def _demo():
     return 0
 
 def _cli():
-    parser = argparse.ArgumentParser(description="基于密码的 AES-256-GCM 加/解密工具（支持中文/英文）。")
+    parser = argparse.ArgumentParser(
+        description="基于密码的加/解密工具（支持中文/英文）。字符串默认使用 AES-256-GCM，"
+                    "在没有 AES 硬件加速的 CPU 上自动改用 ChaCha20-Poly1305；"
+                    "文件流式加密（encrypt_file）固定使用 AES-256-GCM。")
     sub = parser.add_subparsers(dest="cmd")
-    p_enc = sub.add_parser("encrypt", help="加密字符串")
+    p_enc = sub.add_parser("encrypt", help="加密字符串（AES-256-GCM，无 AES 硬件加速时为 ChaCha20-Poly1305）")
     p_enc.add_argument("password", help="用于派生密钥的密码")
     p_enc.add_argument("input", help="要加密的字符串")
-    p_dec = sub.add_parser("decrypt", help="解密 token（base64）到明文")
+    p_dec = sub.add_parser("decrypt", help="解密 token（base64）到明文，算法由 token 头自动识别")
     p_dec.add_argument("password", help="用于派生密钥的密码")
     p_dec.add_argument("token", help="要解密的 base64 token")
     p_demo = sub.add_parser("demo", help="运行内置自测，演示中英混合加解密")
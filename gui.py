@@ -8,7 +8,7 @@
 - 文本输入（可粘贴中文/英文）
 - Token 输出（base64）
 - 加密 / 解密 按钮
-- 从文件加载文本、将输出保存到文件
+- 从文件加载文本、将输出保存到文件（超过 8MB 的文件改为流式加/解密，显示进度条）
 - 复制输出到剪贴板、状态提示
 
 用法：直接运行此文件：
@@ -18,29 +18,49 @@
 
 from __future__ import annotations
 
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
 import importlib.util
 import os
 import sys
 import threading
 import traceback
 import tkinter as tk
-from tkinter import filedialog, messagebox
+from tkinter import filedialog, messagebox, ttk
 
 HERE = os.path.dirname(__file__) if __file__ else os.getcwd()
 MODULE_PATH = os.path.join(HERE, "1.py")
 SETTINGS_PATH = os.path.join(HERE, ".gui_settings.json")
+# 设置变更后延迟写盘的时间（毫秒），期间的多次变更合并为一次写入
+SETTINGS_SAVE_DELAY_MS = 500
+# 超过该大小的文件不再读入文本框，而是直接调用模块的 encrypt_file/decrypt_file 流式处理
+LARGE_FILE_THRESHOLD = 8 * 1024 * 1024
 
 import json
 
 
 class Settings:
-    """简单的 JSON 设置管理：记住密码与最近文件列表。"""
-    def __init__(self, path: str = SETTINGS_PATH):
+    """简单的 JSON 设置管理：记住密码与最近文件列表。
+
+    传入 root 时，变更通过 root.after 合并延迟写盘；否则立即写盘。
+    """
+    __slots__ = (
+        'path', 'root', '_save_after_id', 'remember_password', 'password',
+        'recent_files', '_recent_set', '_max_recent', '_last_saved',
+    )
+
+    def __init__(self, path: str = SETTINGS_PATH, root: tk.Misc | None = None):
         self.path = path
+        self.root = root
+        self._save_after_id: str | None = None
         self.remember_password = False
         self.password = ""
         self.recent_files: list[str] = []
+        # 与 recent_files 同步的成员集合，用于 O(1) 去重判断
+        self._recent_set: set[str] = set()
         self._max_recent = 8
+        # 最近一次写入（或读取）的序列化内容，未变化时跳过写盘
+        self._last_saved: str | None = None
         self.load()
 
     def load(self) -> None:
@@ -50,22 +70,63 @@ class Settings:
                     data = json.load(f)
                 self.remember_password = bool(data.get('remember_password', False))
                 self.password = str(data.get('password', '')) if self.remember_password else ''
-                self.recent_files = list(dict.fromkeys(data.get('recent_files', [])))[: self._max_recent]
+                # 单次遍历：保序去重，取满即停
+                recent: list[str] = []
+                seen: set[str] = set()
+                for fp in data.get('recent_files', []):
+                    if fp not in seen:
+                        seen.add(fp)
+                        recent.append(fp)
+                        if len(recent) >= self._max_recent:
+                            break
+                self.recent_files = recent
+                self._recent_set = seen
+                self._last_saved = self._serialize()
         except Exception:
             # 忽略读取错误，保持默认
             self.remember_password = False
             self.password = ''
             self.recent_files = []
+            self._recent_set = set()
+
+    def _serialize(self) -> str:
+        data = {
+            'remember_password': bool(self.remember_password),
+            'password': self.password if self.remember_password else '',
+            'recent_files': list(self.recent_files[: self._max_recent]),
+        }
+        return json.dumps(data, ensure_ascii=False, indent=2)
 
     def save(self) -> None:
+        """立即写盘（取消尚未执行的延迟写入）。"""
+        if self._save_after_id is not None and self.root is not None:
+            try:
+                self.root.after_cancel(self._save_after_id)
+            except Exception:
+                pass
+        self._flush_save()
+
+    def schedule_save(self) -> None:
+        if self.root is None:
+            self._flush_save()
+            return
+        # 重新计时：只有最后一次变更后静默 SETTINGS_SAVE_DELAY_MS 才写盘
+        if self._save_after_id is not None:
+            self.root.after_cancel(self._save_after_id)
+        self._save_after_id = self.root.after(SETTINGS_SAVE_DELAY_MS, self._flush_save)
+
+    def _flush_save(self) -> None:
+        self._save_after_id = None
         try:
-            data = {
-                'remember_password': bool(self.remember_password),
-                'password': self.password if self.remember_password else '',
-                'recent_files': list(self.recent_files[: self._max_recent]),
-            }
-            with open(self.path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            text = self._serialize()
+            if text == self._last_saved:
+                return
+            # 先写临时文件再原子替换，避免中途失败留下半个 JSON
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_path, self.path)
+            self._last_saved = text
         except Exception:
             # 写失败不抛出
             pass
@@ -74,21 +135,37 @@ class Settings:
         try:
             if not filepath:
                 return
+            # 已在首位则无需改动
+            if self.recent_files and self.recent_files[0] == filepath:
+                return
             # 最近优先，去重
-            if filepath in self.recent_files:
+            if filepath in self._recent_set:
                 self.recent_files.remove(filepath)
+            else:
+                self._recent_set.add(filepath)
             self.recent_files.insert(0, filepath)
-            self.recent_files = self.recent_files[: self._max_recent]
-            self.save()
+            while len(self.recent_files) > self._max_recent:
+                self._recent_set.discard(self.recent_files.pop())
+            self.schedule_save()
         except Exception:
             pass
 
 
 
+_MODULE_CACHE: dict[tuple[str, int], object] = {}
+
+
 def load_encrypt_module(path: str):
-    """按路径动态加载模块并返回包含 encrypt/decrypt 的模块对象。"""
+    """按路径动态加载模块并返回包含 encrypt/decrypt 的模块对象。
+
+    以 (路径, 修改时间) 缓存：文件未变时直接返回已加载的模块，保留其中的密钥缓存等状态。
+    """
     if not os.path.exists(path):
         raise FileNotFoundError(f"未找到 {path}")
+    cache_key = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+    cached = _MODULE_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
     spec = importlib.util.spec_from_file_location("encrypt_module", path)
     if spec is None or spec.loader is None:
         raise ImportError("无法创建模块规范")
@@ -97,9 +174,37 @@ def load_encrypt_module(path: str):
     # 验证存在 encrypt/decrypt
     if not hasattr(mod, "encrypt") or not hasattr(mod, "decrypt"):
         raise AttributeError("模块中未找到 encrypt/decrypt 函数")
+    # 文件已修改时丢弃同一路径的旧版本
+    for key in [k for k in _MODULE_CACHE if k[0] == cache_key[0]]:
+        del _MODULE_CACHE[key]
+    _MODULE_CACHE[cache_key] = mod
     return mod
 
 
+def _is_stream_blob(mod, path: str) -> bool:
+    """文件是否为模块 encrypt_file 生成的原始加密文件（而非保存的 base64 token 等文本）。"""
+    checker = getattr(mod, "is_encrypted_file", None)
+    if checker is None:
+        return False
+    try:
+        return bool(checker(path))
+    except OSError:
+        return False
+
+
+def _pool_slot(password: str, n_slots: int) -> int:
+    """按密码选择工作进程：同一密码总落在同一进程，使该进程中的密钥缓存持续命中。"""
+    return hash(password) % n_slots
+
+
+def _pool_call(path: str, func_name: str, *args):
+    """进程池中执行：按路径加载（由 load_encrypt_module 缓存）加密模块并调用指定函数。
+
+    动态加载的模块无法被 pickle 引用，因此只把路径与函数名传给子进程。
+    """
+    return getattr(load_encrypt_module(path), func_name)(*args)
+
+
 class CryptoGUI:
     def __init__(self, root: tk.Tk):
         self.root = root
@@ -107,7 +212,7 @@ class CryptoGUI:
         root.geometry("800x600")
 
         # 顶部：密码、记住密码与最近文件
-        self.settings = Settings()
+        self.settings = Settings(root=root)
 
         frm_top = tk.Frame(root)
         frm_top.pack(fill=tk.X, padx=8, pady=6)
@@ -125,6 +230,8 @@ class CryptoGUI:
         self.var_recent = tk.StringVar(value=recent_list[0])
         self.opt_recent = tk.OptionMenu(frm_top, self.var_recent, *recent_list, command=self._on_select_recent)
         self.opt_recent.config(width=24)
+        # 最近一次渲染到下拉菜单中的列表（None 表示尚未渲染）
+        self._recent_rendered: tuple[str, ...] | None = None
         self.opt_recent.pack(side=tk.LEFT, padx=6)
 
 
@@ -171,6 +278,13 @@ class CryptoGUI:
         tk.Button(frm_bottom, text="清空输出", command=lambda: self.txt_output.delete(1.0, tk.END)).pack(side=tk.LEFT)
         self.lbl_status = tk.Label(frm_bottom, text="模块未加载", anchor=tk.W)
         self.lbl_status.pack(side=tk.RIGHT)
+        self.progress = ttk.Progressbar(frm_bottom, length=160, maximum=1.0)
+        self.progress.pack(side=tk.RIGHT, padx=8)
+
+        # 加/解密任务的进程池：每个 CPU 一个单进程执行器，按密码路由（见 _pool_slot），
+        # 不同密码的任务可并行，同一密码的任务复用同一进程内的密钥缓存（PBKDF2 与 AEAD 对象）。
+        # 各执行器首次使用时创建
+        self._pools: list[concurrent.futures.ProcessPoolExecutor | None] = [None] * (os.cpu_count() or 1)
 
         # 立即尝试加载模块（若存在）
         try:
@@ -200,6 +314,42 @@ class CryptoGUI:
             self.lbl_status.config(text="模块加载失败")
             messagebox.showerror("加载失败", f"加载模块失败：{e}\n{traceback.format_exc()}")
 
+    def _on_close(self):
+        self.settings.save()
+        for slot in range(len(self._pools)):
+            self._discard_pool(slot)
+        self.root.destroy()
+
+    def _get_pool(self, slot: int) -> concurrent.futures.ProcessPoolExecutor:
+        pool = self._pools[slot]
+        if pool is None:
+            pool = self._pools[slot] = concurrent.futures.ProcessPoolExecutor(max_workers=1)
+        return pool
+
+    def _discard_pool(self, slot: int) -> None:
+        pool, self._pools[slot] = self._pools[slot], None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, func_name: str, password: str, data: str, on_done) -> None:
+        """把任务提交到该密码对应的工作进程，并在 Tk 主线程中轮询，完成后以 future 调用 on_done。"""
+        slot = _pool_slot(password, len(self._pools))
+        try:
+            future = self._get_pool(slot).submit(_pool_call, MODULE_PATH, func_name, password, data)
+        except BrokenProcessPool:
+            # 工作进程已意外退出：丢弃旧执行器并重建后重试一次
+            self._discard_pool(slot)
+            future = self._get_pool(slot).submit(_pool_call, MODULE_PATH, func_name, password, data)
+
+        def poll():
+            if future.done():
+                if isinstance(future.exception(), BrokenProcessPool):
+                    self._discard_pool(slot)
+                on_done(future)
+            else:
+                self.root.after(50, poll)
+        self.root.after(50, poll)
+
     def _on_toggle_remember(self):
         self.settings.remember_password = bool(self.var_remember.get())
         if not self.settings.remember_password:
@@ -208,7 +358,7 @@ class CryptoGUI:
         else:
             # 保存当前密码
             self.settings.password = self.entry_password.get()
-        self.settings.save()
+        self.settings.schedule_save()
 
     def _on_select_recent(self, value: str):
         # 下拉选择了最近的文件，尝试加载到输入框
@@ -216,9 +366,10 @@ class CryptoGUI:
             return
         try:
             if os.path.exists(value):
+                if self._stream_large_file(value):
+                    return
                 with open(value, 'r', encoding='utf-8') as f:
-                    self.txt_input.delete(1.0, tk.END)
-                    self.txt_input.insert(tk.END, f.read())
+                    self.txt_input.replace(1.0, tk.END, f.read())
                 self.lbl_status.config(text=f"已从最近文件加载: {os.path.basename(value)}")
                 # 将该文件移动到最近首位并保存
                 self.settings.add_recent(value)
@@ -230,9 +381,13 @@ class CryptoGUI:
 
     def _refresh_recent_menu(self):
         # 重新填充最近文件下拉菜单，保证至少有一个选项
+        recent_list = self.settings.recent_files if self.settings.recent_files else ['']
+        # 列表未变化时跳过 delete + 逐项 add_command 的重建
+        if tuple(recent_list) == self._recent_rendered:
+            return
+        self._recent_rendered = tuple(recent_list)
         menu = self.opt_recent['menu']
         menu.delete(0, 'end')
-        recent_list = self.settings.recent_files if self.settings.recent_files else ['']
         for fpath in recent_list:
             menu.add_command(label=fpath, command=lambda v=fpath: self.var_recent.set(v) or self._on_select_recent(v))
         # 保证变量值合法
@@ -243,10 +398,11 @@ class CryptoGUI:
         p = filedialog.askopenfilename(title="选择要加载的文本文件", filetypes=[("Text files", "*.txt;*.md;*.*")])
         if not p:
             return
+        if self._stream_large_file(p):
+            return
         try:
             with open(p, 'r', encoding='utf-8') as f:
-                self.txt_input.delete(1.0, tk.END)
-                self.txt_input.insert(tk.END, f.read())
+                self.txt_input.replace(1.0, tk.END, f.read())
                 self.lbl_status.config(text=f"已从文件加载: {os.path.basename(p)}")
                 # 更新最近文件列表
                 self.settings.add_recent(p)
@@ -254,6 +410,74 @@ class CryptoGUI:
         except Exception as e:
             messagebox.showerror("读取失败", f"无法读取文件：{e}")
 
+    def _stream_large_file(self, path: str) -> bool:
+        """大文件直接流式加/解密到另一个文件；返回 True 表示已接管（不再读入文本框）。"""
+        try:
+            if os.path.getsize(path) <= LARGE_FILE_THRESHOLD:
+                return False
+        except OSError:
+            return False
+        if not self.mod or not hasattr(self.mod, "encrypt_file") or not hasattr(self.mod, "decrypt_file"):
+            return False
+        name = os.path.basename(path)
+        size_mb = LARGE_FILE_THRESHOLD // (1024 * 1024)
+        if _is_stream_blob(self.mod, path):
+            # 流式加密生成的二进制文件：只能流式解密
+            if not messagebox.askokcancel("大文件", f"{name} 是流式加密文件（超过 {size_mb}MB），是否直接流式解密？"):
+                return True
+            choice = False
+        else:
+            # 其他文件（包括“保存到文件”得到的 base64 token）可流式加密，或照常载入文本框
+            choice = messagebox.askyesnocancel(
+                "大文件",
+                f"{name} 超过 {size_mb}MB。\n\n是：不载入文本框，直接流式加密该文件\n"
+                "否：载入文本框（例如保存的 token，载入后可解密）",
+            )
+            if choice is None:
+                return True
+            if not choice:
+                return False
+        password = self.entry_password.get()
+        if password == "":
+            messagebox.showwarning("缺少密码", "文件较大，将直接流式处理，请先输入密码")
+            return True
+        out = filedialog.asksaveasfilename(title="保存结果到文件")
+        if not out:
+            return True
+        func = self.mod.encrypt_file if choice else self.mod.decrypt_file
+        action = "加密" if choice else "解密"
+        state = {"done": 0, "total": 1, "error": None, "finished": False}
+
+        def on_progress(done, total):
+            state["done"], state["total"] = done, total or 1
+
+        def work():
+            try:
+                func(password, path, out, progress=on_progress)
+            except Exception as e:
+                state["error"] = e
+            state["finished"] = True
+
+        def poll():
+            # Tk 只能在主线程操作，工作线程仅更新 state，由这里定时读取
+            self.progress['value'] = state["done"] / state["total"]
+            if not state["finished"]:
+                self.root.after(100, poll)
+            elif state["error"] is not None:
+                self.lbl_status.config(text=f"{action}失败")
+                messagebox.showerror(f"{action}失败", f"错误：{state['error']}")
+            else:
+                self.progress['value'] = 1.0
+                self.lbl_status.config(text=f"{action}完成: {os.path.basename(out)}")
+                self.settings.add_recent(path)
+                self._refresh_recent_menu()
+
+        self.progress['value'] = 0
+        self.lbl_status.config(text=f"正在{action}: {os.path.basename(path)}")
+        threading.Thread(target=work, daemon=True).start()
+        self.root.after(100, poll)
+        return True
+
     def _save_output_to_file(self):
         p = filedialog.asksaveasfilename(title="保存 Token 到文件", defaultextension='.txt', filetypes=[('Text','*.txt')])
         if not p:
@@ -285,16 +509,16 @@ class CryptoGUI:
             messagebox.showwarning("缺少密码", "请输入密码")
             return
         plaintext = self.txt_input.get(1.0, tk.END).rstrip('\n')
-        def work():
+        def done(future):
             try:
-                token = self.mod.encrypt(password, plaintext)
-                self.txt_output.delete(1.0, tk.END)
-                self.txt_output.insert(tk.END, token)
+                token = future.result()
+                # 一次 replace 代替 delete + insert，只触发一次重排
+                self.txt_output.replace(1.0, tk.END, token)
                 self.lbl_status.config(text="加密成功")
             except Exception as e:
                 self.lbl_status.config(text="加密失败")
                 messagebox.showerror("加密失败", f"错误：{e}\n{traceback.format_exc()}")
-        threading.Thread(target=work, daemon=True).start()
+        self._submit("encrypt", password, plaintext, done)
 
     def _run_decrypt(self):
         if not self.mod:
@@ -305,16 +529,15 @@ class CryptoGUI:
             messagebox.showwarning("缺少密码", "请输入密码")
             return
         token = self.txt_input.get(1.0, tk.END).strip()
-        def work():
+        def done(future):
             try:
-                plaintext = self.mod.decrypt(password, token)
-                self.txt_output.delete(1.0, tk.END)
-                self.txt_output.insert(tk.END, plaintext)
+                plaintext = future.result()
+                self.txt_output.replace(1.0, tk.END, plaintext)
                 self.lbl_status.config(text="解密成功")
             except Exception as e:
                 self.lbl_status.config(text="解密失败")
                 messagebox.showerror("解密失败", f"错误：{e}\n{traceback.format_exc()}")
-        threading.Thread(target=work, daemon=True).start()
+        self._submit("decrypt", password, token, done)
 
 
 def main():
@@ -0,0 +1,277 @@
+"""1.py 的回归测试（模块名为数字，按路径加载）。"""
+import binascii
+import hashlib
+import importlib.util
+import os
+
+import pytest
+
+pytest.importorskip("cryptography")
+
+MODULE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "1.py")
+
+
+@pytest.fixture(scope="module")
+def mod():
+    spec = importlib.util.spec_from_file_location("encrypt_module", MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _write(path, data: bytes) -> str:
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+def _read(path) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _leftover_parts(tmp_path):
+    return [p.name for p in tmp_path.iterdir() if p.name.endswith(".part")]
+
+
+@pytest.fixture
+def kdf_calls(mod, monkeypatch):
+    """记录每次密钥派生请求的迭代次数。"""
+    calls = []
+    real = mod._derive_key
+
+    def spy(password, salt, iterations=200_000, length=32):
+        calls.append(iterations)
+        return real(password, salt, iterations, length)
+
+    monkeypatch.setattr(mod, "_derive_key", spy)
+    return calls
+
+
+def _legacy_token(mod, password: str, plaintext: str, salt: bytes) -> str:
+    """按基线版本的格式（无头部，AES-GCM，200_000 次迭代）构造 token。"""
+    nonce = os.urandom(12)
+    key = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, 200_000, 32)
+    ciphertext = mod.AESGCM(key).encrypt(nonce, plaintext.encode("utf-8"), None)
+    return binascii.b2a_base64(salt + nonce + ciphertext, newline=False).decode("ascii")
+
+
+# ---- 密钥缓存 ----
+
+def test_repeat_decrypt_reuses_cached_key(mod):
+    token = mod.encrypt("cache-pw", "cached")
+    mod.clear_key_cache()
+    assert mod.decrypt("cache-pw", token) == "cached"
+    before = mod._derive_key_cached.cache_info()
+    assert mod.decrypt("cache-pw", token) == "cached"
+    after = mod._derive_key_cached.cache_info()
+    assert after.misses == before.misses
+    assert after.hits == before.hits + 1
+
+
+def test_clear_key_cache_empties_key_and_aead_caches(mod):
+    mod.decrypt("pw", mod.encrypt("pw", "x"))
+    assert mod._derive_key_cached.cache_info().currsize > 0
+    assert mod._aead_for.cache_info().currsize > 0
+    mod.clear_key_cache()
+    assert mod._derive_key_cached.cache_info().currsize == 0
+    assert mod._aead_for.cache_info().currsize == 0
+
+
+@pytest.mark.parametrize("length", [16, 32, 33, 80])
+def test_derive_key_length_matches_pbkdf2(mod, length):
+    salt = b"s" * 16
+    expected = hashlib.pbkdf2_hmac("sha256", "密码".encode("utf-8"), salt, 1000, length)
+    assert mod._derive_key("密码", salt, 1000, length) == expected
+
+
+@pytest.mark.parametrize("length", [0, -1])
+def test_derive_key_rejects_non_positive_length(mod, length):
+    with pytest.raises(ValueError):
+        mod._derive_key("pw", b"s" * 16, 1000, length)
+
+
+# ---- token 格式 ----
+
+def test_roundtrip_uses_default_iterations(mod, kdf_calls):
+    token = mod.encrypt("pw", "你好 hello")
+    assert mod.decrypt("pw", token) == "你好 hello"
+    assert kdf_calls == [1 << mod.DEFAULT_LOG2_ITERATIONS] * 2
+    assert (1 << mod.DEFAULT_LOG2_ITERATIONS) <= 200_000
+
+
+@pytest.mark.parametrize("salt_prefix", [
+    b"\x11\x38",            # 曾被误判为版本 1 头，触发 2**24 次迭代
+    b"\x11\x37",
+    b"\x01",
+    b"\x89GGT\x11\x38",    # 与魔数冲突但迭代次数超出上限，头部无效
+])
+def test_legacy_token_with_header_like_salt(mod, kdf_calls, salt_prefix):
+    salt = salt_prefix + os.urandom(16 - len(salt_prefix))
+    token = _legacy_token(mod, "pw", "legacy", salt)
+    kdf_calls.clear()
+    assert mod.decrypt("pw", token) == "legacy"
+    assert max(kdf_calls) <= 200_000
+
+
+def test_legacy_token_with_full_header_collision_is_not_retried(mod, kdf_calls):
+    # 魔数与头部都合法时按版本 1 处理（误判概率 2**-32），不再以旧格式重试
+    salt = b"\x89GGT\x11\x31" + os.urandom(10)
+    token = _legacy_token(mod, "pw", "legacy", salt)
+    kdf_calls.clear()
+    with pytest.raises(ValueError):
+        mod.decrypt("pw", token)
+    assert kdf_calls == [1 << 17]
+
+
+def test_wrong_password_derives_key_once(mod, kdf_calls):
+    token = mod.encrypt("pw", "secret")
+    kdf_calls.clear()
+    with pytest.raises(ValueError):
+        mod.decrypt("wrong", token)
+    assert kdf_calls == [1 << mod.DEFAULT_LOG2_ITERATIONS]
+
+
+def test_tampered_header_cannot_exceed_iteration_cap(mod, kdf_calls):
+    data = bytearray(binascii.a2b_base64(mod.encrypt("pw", "x")))
+    data[len(mod._MAGIC) + 1] = (data[len(mod._MAGIC) + 1] & 0xE0) | 24
+    kdf_calls.clear()
+    with pytest.raises(ValueError):
+        mod.decrypt("pw", binascii.b2a_base64(bytes(data), newline=False).decode("ascii"))
+    assert max(kdf_calls) <= 200_000
+
+
+def test_encrypt_rejects_iterations_above_cap(mod):
+    with pytest.raises(ValueError):
+        mod.encrypt("pw", "x", log2_iterations=mod._MAX_LOG2_ITERATIONS + 1)
+
+
+# ---- AEAD 算法选择 ----
+
+def _token_alg(mod, token: str) -> int:
+    return binascii.a2b_base64(token)[len(mod._MAGIC)] & 0x0F
+
+
+def test_chacha20_roundtrip_and_dispatch(mod, monkeypatch):
+    monkeypatch.setattr(mod, "_DEFAULT_ALG", mod._ALG_CHACHA20)
+    token = mod.encrypt("pw", "ChaCha 你好")
+    assert _token_alg(mod, token) == mod._ALG_CHACHA20
+    assert mod.decrypt("pw", token) == "ChaCha 你好"
+    # 切回 AES-GCM 后，旧的 ChaCha20 token 仍按其算法标记解密
+    monkeypatch.setattr(mod, "_DEFAULT_ALG", mod._ALG_AESGCM)
+    aes_token = mod.encrypt("pw", "AES")
+    assert _token_alg(mod, aes_token) == mod._ALG_AESGCM
+    mod.clear_key_cache()
+    assert mod.decrypt("pw", token) == "ChaCha 你好"
+    assert mod.decrypt("pw", aes_token) == "AES"
+
+
+def test_swapped_algorithm_tag_fails_to_decrypt(mod, monkeypatch):
+    # 把 ChaCha20 token 的算法标记改为 AES-GCM，应解密失败而不是输出错误明文
+    monkeypatch.setattr(mod, "_DEFAULT_ALG", mod._ALG_CHACHA20)
+    data = bytearray(binascii.a2b_base64(mod.encrypt("pw", "x")))
+    data[len(mod._MAGIC)] = (data[len(mod._MAGIC)] & 0xF0) | mod._ALG_AESGCM
+    with pytest.raises(ValueError):
+        mod.decrypt("pw", binascii.b2a_base64(bytes(data), newline=False).decode("ascii"))
+
+
+@pytest.mark.parametrize("cpuinfo, expected", [
+    ("processor\t: 0\nflags\t\t: fpu sse2 aes pclmulqdq avx2\n", True),
+    ("processor\t: 0\nflags\t\t: fpu sse2 avx2\n", False),
+    ("processor\t: 0\nflags\t\t: fpu sse2 aes\n", False),
+    ("processor\t: 0\nFeatures\t: fp asimd aes pmull sha1 sha2\n", True),
+    ("processor\t: 0\nFeatures\t: fp asimd\n", False),
+    ("processor\t: 0\n", True),  # 无法判断时视为支持
+])
+def test_cpu_has_aes_accel(mod, tmp_path, cpuinfo, expected):
+    path = tmp_path / "cpuinfo"
+    path.write_text(cpuinfo, encoding="utf-8")
+    assert mod._cpu_has_aes_accel(str(path)) is expected
+
+
+def test_cpu_has_aes_accel_without_cpuinfo(mod, tmp_path):
+    assert mod._cpu_has_aes_accel(str(tmp_path / "missing")) is True
+
+
+# ---- 文件流式接口 ----
+
+def test_file_roundtrip(mod, tmp_path):
+    data = os.urandom(3 * (1 << 20) + 7)
+    src = _write(tmp_path / "in.bin", data)
+    enc, out = str(tmp_path / "in.enc"), str(tmp_path / "out.bin")
+    seen = []
+    mod.encrypt_file("pw", src, enc, progress=lambda done, total: seen.append((done, total)), log2_iterations=4)
+    decrypt_seen = []
+    mod.decrypt_file("pw", enc, out, progress=lambda done, total: decrypt_seen.append((done, total)))
+    assert _read(out) == data
+    assert seen[-1] == (len(data), len(data))
+    assert decrypt_seen[-1] == (len(data), len(data))
+    assert not _leftover_parts(tmp_path)
+
+
+def test_empty_plaintext_file_roundtrip(mod, tmp_path):
+    src = _write(tmp_path / "empty.txt", b"")
+    enc, out = str(tmp_path / "empty.enc"), str(tmp_path / "empty.out")
+    mod.encrypt_file("pw", src, enc, log2_iterations=4)
+    mod.decrypt_file("pw", enc, out)
+    assert _read(out) == b""
+
+
+@pytest.mark.parametrize("content", [b"", b"\x11"])
+def test_decrypt_file_rejects_short_input(mod, tmp_path, content):
+    src = _write(tmp_path / "bad.enc", content)
+    with pytest.raises(ValueError):
+        mod.decrypt_file("pw", src, str(tmp_path / "out"))
+    assert not os.path.exists(tmp_path / "out")
+    assert not _leftover_parts(tmp_path)
+
+
+def test_decrypt_file_truncated(mod, tmp_path):
+    src = _write(tmp_path / "in.bin", os.urandom(5000))
+    enc = str(tmp_path / "in.enc")
+    mod.encrypt_file("pw", src, enc, log2_iterations=4)
+    blob = _read(enc)
+    for cut in (len(blob) - 1, len(blob) // 2, 20):
+        bad = _write(tmp_path / "cut.enc", blob[:cut])
+        with pytest.raises(ValueError):
+            mod.decrypt_file("pw", bad, str(tmp_path / "out"))
+        assert not os.path.exists(tmp_path / "out")
+        assert not _leftover_parts(tmp_path)
+
+
+def test_decrypt_file_wrong_password(mod, tmp_path):
+    src = _write(tmp_path / "in.bin", b"secret" * 1000)
+    enc = str(tmp_path / "in.enc")
+    mod.encrypt_file("pw", src, enc, log2_iterations=4)
+    with pytest.raises(ValueError):
+        mod.decrypt_file("wrong", enc, str(tmp_path / "out"))
+    assert not os.path.exists(tmp_path / "out")
+    assert not _leftover_parts(tmp_path)
+
+
+def test_decrypt_file_tampered(mod, tmp_path):
+    src = _write(tmp_path / "in.bin", b"secret" * 1000)
+    enc = str(tmp_path / "in.enc")
+    mod.encrypt_file("pw", src, enc, log2_iterations=4)
+    blob = bytearray(_read(enc))
+    blob[len(blob) // 2] ^= 0x01
+    bad = _write(tmp_path / "bad.enc", bytes(blob))
+    with pytest.raises(ValueError):
+        mod.decrypt_file("pw", bad, str(tmp_path / "out"))
+    assert not os.path.exists(tmp_path / "out")
+    assert not _leftover_parts(tmp_path)
+
+
+def test_file_in_place(mod, tmp_path):
+    data = os.urandom(10000)
+    path = _write(tmp_path / "doc.bin", data)
+    mod.encrypt_file("pw", path, path, log2_iterations=4)
+    encrypted = _read(path)
+    assert encrypted != data
+    # 原地解密失败时不能破坏输入文件
+    with pytest.raises(ValueError):
+        mod.decrypt_file("wrong", path, path)
+    assert _read(path) == encrypted
+    mod.decrypt_file("pw", path, path)
+    assert _read(path) == data
+    assert not _leftover_parts(tmp_path)
@@ -0,0 +1,189 @@
+"""gui.py 中与界面无关部分的测试（无需显示器）。"""
+import importlib.util
+import json
+import os
+
+import pytest
+
+pytest.importorskip("tkinter")
+pytest.importorskip("cryptography")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def gui():
+    spec = importlib.util.spec_from_file_location("gui", os.path.join(ROOT, "gui.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="module")
+def mod(gui):
+    return gui.load_encrypt_module(gui.MODULE_PATH)
+
+
+# ---- 大文件流式处理 ----
+
+def test_saved_token_file_is_not_stream_blob(gui, mod, tmp_path):
+    # “保存到文件”写出的 base64 token 超过阈值时，仍须按文本载入后解密
+    plaintext = "x" * (7 * 1024 * 1024)
+    token = mod.encrypt("pw", plaintext, log2_iterations=4)
+    path = tmp_path / "token.txt"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(token + "\n")
+    assert os.path.getsize(path) > gui.LARGE_FILE_THRESHOLD
+    assert not gui._is_stream_blob(mod, str(path))
+    with open(path, "r", encoding="utf-8") as f:
+        assert mod.decrypt("pw", f.read().strip()) == plaintext
+
+
+def test_encrypt_file_output_is_stream_blob(gui, mod, tmp_path):
+    src = tmp_path / "in.bin"
+    src.write_bytes(os.urandom(1000))
+    enc = str(tmp_path / "in.enc")
+    mod.encrypt_file("pw", str(src), enc, log2_iterations=4)
+    assert gui._is_stream_blob(mod, enc)
+    assert not gui._is_stream_blob(mod, str(src))
+    assert not gui._is_stream_blob(mod, str(tmp_path / "missing"))
+
+
+# ---- 进程池路由 ----
+
+def test_pool_slot_is_stable_per_password(gui):
+    slots = {gui._pool_slot(f"pw{i}", 4) for i in range(64)}
+    assert slots <= set(range(4))
+    assert len(slots) > 1
+    assert all(gui._pool_slot("同一密码", 4) == gui._pool_slot("同一密码", 4) for _ in range(10))
+
+
+# ---- Settings ----
+
+@pytest.fixture
+def replace_calls(gui, monkeypatch):
+    """记录 Settings 写盘时的 os.replace 调用。"""
+    calls = []
+    real = os.replace
+
+    def spy(src, dst):
+        calls.append(dst)
+        return real(src, dst)
+
+    monkeypatch.setattr(gui.os, "replace", spy)
+    return calls
+
+
+def test_settings_load_dedups_in_order_and_truncates(gui, tmp_path):
+    path = tmp_path / "settings.json"
+    recent = ["a", "b", "a", "c", "b"] + [f"f{i}" for i in range(20)]
+    path.write_text(json.dumps({"recent_files": recent}), encoding="utf-8")
+    settings = gui.Settings(str(path))
+    assert settings.recent_files == ["a", "b", "c", "f0", "f1", "f2", "f3", "f4"]
+    assert settings._recent_set == set(settings.recent_files)
+
+
+def test_settings_add_recent_keeps_set_in_sync_after_evictions(gui, tmp_path):
+    settings = gui.Settings(str(tmp_path / "settings.json"))
+    for i in range(20):
+        settings.add_recent(f"f{i % 11}")
+    assert len(settings.recent_files) == 8
+    assert len(set(settings.recent_files)) == 8
+    assert settings._recent_set == set(settings.recent_files)
+    settings.add_recent("f3")
+    assert settings.recent_files[0] == "f3"
+    assert settings._recent_set == set(settings.recent_files)
+
+
+def test_settings_skips_unchanged_writes(gui, tmp_path, replace_calls):
+    path = str(tmp_path / "settings.json")
+    settings = gui.Settings(path)
+    settings.add_recent("a")
+    settings.add_recent("b")
+    assert len(replace_calls) == 2
+    settings.add_recent("b")  # 已在首位
+    settings.save()           # 内容未变
+    assert len(replace_calls) == 2
+    # 重新加载后内容相同，同样不写盘
+    reloaded = gui.Settings(path)
+    reloaded.save()
+    assert len(replace_calls) == 2
+    assert reloaded.recent_files == ["b", "a"]
+
+
+class _FakeRoot:
+    """模拟 Tk 的 after/after_cancel，手动触发定时任务。"""
+
+    def __init__(self):
+        self.jobs = {}
+        self._next = 0
+
+    def after(self, ms, func):
+        self._next += 1
+        job_id = f"after#{self._next}"
+        self.jobs[job_id] = func
+        return job_id
+
+    def after_cancel(self, job_id):
+        self.jobs.pop(job_id, None)
+
+    def run_pending(self):
+        jobs, self.jobs = self.jobs, {}
+        for func in jobs.values():
+            func()
+
+
+def test_settings_debounces_saves(gui, tmp_path, replace_calls):
+    path = tmp_path / "settings.json"
+    root = _FakeRoot()
+    settings = gui.Settings(str(path), root=root)
+    settings.add_recent("a")
+    settings.add_recent("b")
+    settings.add_recent("c")
+    # 每次变更都重新计时，只保留一个待执行的写盘任务
+    assert len(root.jobs) == 1
+    assert not path.exists()
+    root.run_pending()
+    assert len(replace_calls) == 1
+    assert json.loads(path.read_text(encoding="utf-8"))["recent_files"] == ["c", "b", "a"]
+
+
+def test_settings_save_flushes_and_cancels_pending(gui, tmp_path, replace_calls):
+    path = tmp_path / "settings.json"
+    root = _FakeRoot()
+    settings = gui.Settings(str(path), root=root)
+    settings.add_recent("a")
+    settings.save()
+    assert len(replace_calls) == 1
+    assert not root.jobs
+    assert json.loads(path.read_text(encoding="utf-8"))["recent_files"] == ["a"]
+
+
+def test_settings_write_leaves_no_tmp_file(gui, tmp_path):
+    path = tmp_path / "settings.json"
+    settings = gui.Settings(str(path))
+    settings.add_recent("a")
+    settings.remember_password = True
+    settings.password = "secret"
+    settings.save()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["settings.json"]
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert data["password"] == "secret" and data["recent_files"] == ["a"]
+
+
+# ---- 模块加载缓存 ----
+
+def test_load_encrypt_module_caches_by_mtime(gui, tmp_path):
+    path = tmp_path / "enc.py"
+    path.write_text("def encrypt(p, t):\n    return t\n\ndef decrypt(p, t):\n    return t\n", encoding="utf-8")
+    first = gui.load_encrypt_module(str(path))
+    assert gui.load_encrypt_module(str(path)) is first
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    second = gui.load_encrypt_module(str(path))
+    assert second is not first
+    assert gui.load_encrypt_module(str(path)) is second
+    # 旧版本的缓存条目已被丢弃
+    assert [k for k in gui._MODULE_CACHE if k[0] == os.path.abspath(path)] == [
+        (os.path.abspath(path), os.stat(path).st_mtime_ns)
+    ]